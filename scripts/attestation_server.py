@@ -19,7 +19,7 @@ Response Format:
         "tee_verified": true | false,
         "vm_size": "Standard_DC4es_v5",
         "azure_attestation": { "encoding": "pkcs7", "signature": "..." },
-        "tpm_pcr_sha256": { "0": "...", "1": "...", ... },
+        "tpm_pcr_sha256": { "0": "...", ..., "7": "..." },  # boot-time PCRs 0-7
         "tee_dmesg": ["Intel TDX: ...", ...],
         "timestamp": "2026-01-29T12:00:00Z"
     }
@@ -33,59 +33,201 @@ For GPU TEE (NCCads_H100_v5), additional fields:
 """
 
 import argparse
+import functools
+import http.client
 import json
 import os
+import re
+import socket
 import subprocess
 import sys
-from datetime import datetime, timezone
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
+try:
+    # orjson serializes the nested PCR+dmesg response several times faster
+    # than stdlib json and returns bytes directly.
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
 
-def get_tee_platform():
+try:
+    # tpm2-pytss keeps one ESAPI context open across requests, so a PCR
+    # read is a single Esys_PCR_Read instead of forking tpm2_pcrread
+    # (which re-scans the TCTI and reopens /dev/tpmrm0 every time).
+    from tpm2_pytss import ESAPI
+    from tpm2_pytss.types import TPML_PCR_SELECTION
+except ImportError:
+    ESAPI = None
+
+# TEE kernel lines don't change after boot, so a short TTL is safe and
+# saves a dmesg fork+decode on every request.
+_DMESG_TTL = 30
+_DMESG_CACHE = {'ts': 0.0, 'text': b''}
+_DMESG_LOCK = threading.Lock()
+
+# Azure Instance Metadata Service; one keep-alive connection is reused
+# across requests instead of forking curl for every GET.
+_IMDS_HOST = '169.254.169.254'
+_IMDS_LOCK = threading.Lock()
+_IMDS_CONN = None
+
+# /dev/tpmrm0 serializes commands at the kernel level anyway; taking a
+# process-wide lock avoids queueing multiple tpm2_pcrread forks against it.
+_TPM_LOCK = threading.Lock()
+
+# Boot-time measurements (firmware, bootloader, kernel) are all attestation
+# needs. Eight digests fit in a single TPML_DIGEST, so this reads in one
+# TPM2_PCR_Read command instead of looping over the full 24-PCR bank.
+_PCR_SELECTION = 'sha256:0,1,2,3,4,5,6,7'
+
+# Persistent ESAPI context (created lazily under _TPM_LOCK when
+# tpm2-pytss is installed).
+_ESAPI = None
+
+# Byte-level patterns so dmesg never needs a full UTF-8 decode; only the
+# handful of matched lines are decoded for the JSON response.
+#
+# The keyword set is kept as one alternation so the whole buffer is scanned
+# in a single pass instead of once per keyword. No \b anchors: kernel lines
+# spell these as intel_tdx, tdx_guest, sev-es etc., where an underscore
+# would suppress the word boundary. If the list grows past a handful of
+# literals, switch to an Aho-Corasick automaton (pyahocorasick).
+_TDX_RE = re.compile(rb'Intel TDX|tdx', re.IGNORECASE)
+_SEV_RE = re.compile(rb'SEV-SNP|sev', re.IGNORECASE)
+_TEE_LINE_RE = re.compile(rb'tdx|sev|memory encryption|confidential|encrypted', re.IGNORECASE)
+_PCR_LINE_RE = re.compile(rb'^\s*(\d+)\s*:\s*(0x[0-9a-fA-F]+)', re.MULTILINE)
+
+# Pre-serialized attestation snapshot, published atomically by rebinding
+# the module global (safe under the GIL). Everything but the timestamp is
+# static between refreshes, so the hot path is a bytes replace of the
+# placeholder rather than re-running getters and re-encoding JSON.
+_SNAPSHOT = None
+_TS_PLACEHOLDER = b'"__TS__"'
+# Rebuilds are cheap: the per-getter TTL caches mean a refresh only
+# re-runs whichever getters have actually expired.
+_SNAPSHOT_REFRESH_SECONDS = 30
+
+# Second-resolution timestamp cache: [epoch second, formatted bytes].
+_TS_CACHE = [0, b'']
+
+
+def _iso_now_bytes():
+    """UTC timestamp as ISO-8601 bytes, reformatted at most once per second."""
+    t = int(time.time())
+    if t != _TS_CACHE[0]:
+        _TS_CACHE[0] = t
+        _TS_CACHE[1] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(t)).encode()
+    return _TS_CACHE[1]
+
+
+def ttl_cache(seconds):
+    """Cache a zero-argument getter's result for `seconds`.
+
+    Attestation fields are static (VM size) or slow-moving (PCRs, Azure
+    attested document), so repeated polling from LiteLLM health checks
+    can be served from memory instead of re-running subprocesses.
+    """
+    def decorator(func):
+        cache = {'ts': 0.0, 'value': None}
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper():
+            with lock:
+                if cache['value'] is not None and time.monotonic() - cache['ts'] < seconds:
+                    return cache['value']
+                value = func()
+                cache['value'] = value
+                cache['ts'] = time.monotonic()
+                return value
+        return wrapper
+    return decorator
+
+
+def _imds_get(path):
+    """GET a path from the Azure IMDS over the shared keep-alive connection."""
+    global _IMDS_CONN
+    with _IMDS_LOCK:
+        if _IMDS_CONN is None:
+            _IMDS_CONN = http.client.HTTPConnection(_IMDS_HOST, timeout=5)
+        try:
+            _IMDS_CONN.request('GET', path, headers={'Metadata': 'true'})
+            return _IMDS_CONN.getresponse().read()
+        except Exception:
+            # A stale keep-alive connection poisons every later request;
+            # drop it and reconnect on the next call.
+            _IMDS_CONN.close()
+            _IMDS_CONN = None
+            raise
+
+
+def _read_dmesg():
+    """Read the kernel log once (as bytes), caching it for _DMESG_TTL seconds."""
+    with _DMESG_LOCK:
+        if time.monotonic() - _DMESG_CACHE['ts'] < _DMESG_TTL:
+            return _DMESG_CACHE['text']
+        text = subprocess.check_output(['dmesg'], stderr=subprocess.DEVNULL, timeout=5)
+        _DMESG_CACHE['text'] = text
+        _DMESG_CACHE['ts'] = time.monotonic()
+        return text
+
+
+def get_tee_platform(dmesg=None):
     """Detect TEE platform from kernel messages."""
     try:
-        dmesg = subprocess.check_output(['dmesg'], stderr=subprocess.DEVNULL, timeout=5).decode()
-        
-        if 'Intel TDX' in dmesg or 'tdx' in dmesg.lower():
+        if dmesg is None:
+            dmesg = _read_dmesg()
+
+        if _TDX_RE.search(dmesg):
             return 'Intel-TDX'
-        elif 'SEV-SNP' in dmesg or 'sev' in dmesg.lower():
+        elif _SEV_RE.search(dmesg):
             return 'AMD-SEV-SNP'
-        elif 'Memory Encryption' in dmesg:
+        elif b'Memory Encryption' in dmesg:
             return 'AMD-SEV-SNP'  # Older SEV without SNP
-        
+
         return 'Unknown'
     except Exception:
         return 'Unknown'
 
 
-def get_tee_dmesg_lines():
+def get_tee_dmesg_lines(dmesg=None):
     """Extract TEE-related kernel messages."""
     try:
-        dmesg = subprocess.check_output(['dmesg'], stderr=subprocess.DEVNULL, timeout=5).decode()
-        lines = dmesg.split('\n')
-        
-        tee_keywords = ['tdx', 'sev', 'memory encryption', 'confidential', 'encrypted']
+        if dmesg is None:
+            dmesg = _read_dmesg()
+
+        # Scan the byte buffer directly and pull out whole lines around each
+        # keyword hit; avoids splitting (and decoding) the entire log.
         tee_lines = []
-        
-        for line in lines:
-            line_lower = line.lower()
-            if any(kw in line_lower for kw in tee_keywords):
-                # Clean up the line (remove timestamp if present)
-                tee_lines.append(line.strip())
-        
-        return tee_lines[:10]  # Limit to 10 most relevant lines
+        last_end = -1
+        for match in _TEE_LINE_RE.finditer(dmesg):
+            start = dmesg.rfind(b'\n', 0, match.start()) + 1
+            if start <= last_end:
+                continue  # second keyword on a line already captured
+            end = dmesg.find(b'\n', match.end())
+            if end == -1:
+                end = len(dmesg)
+            last_end = end
+            tee_lines.append(dmesg[start:end].strip().decode(errors='replace'))
+            if len(tee_lines) == 10:  # Limit to 10 most relevant lines
+                break
+
+        return tee_lines
     except Exception as e:
         return [f'Error reading dmesg: {e}']
 
 
+@ttl_cache(seconds=120)  # Azure signs attested documents with short lifetimes
 def get_azure_attestation():
     """Fetch Azure Instance Metadata Service attestation document."""
     try:
-        result = subprocess.check_output([
-            'curl', '-s', '-H', 'Metadata: true',
-            'http://169.254.169.254/metadata/attested/document?api-version=2021-02-01'
-        ], stderr=subprocess.DEVNULL, timeout=10).decode()
-        
+        result = _imds_get('/metadata/attested/document?api-version=2021-02-01')
+
         data = json.loads(result)
         
         # Return structured attestation with signature preview
@@ -97,26 +239,51 @@ def get_azure_attestation():
         return {'error': str(e)}
 
 
+def _read_pcrs_pytss():
+    """Read the selected PCRs over the persistent ESAPI context."""
+    global _ESAPI
+    with _TPM_LOCK:
+        if _ESAPI is None:
+            _ESAPI = ESAPI(tcti='device:/dev/tpmrm0')
+        _, selection_out, digests = _ESAPI.pcr_read(
+            TPML_PCR_SELECTION.parse(_PCR_SELECTION)
+        )
+
+    # Digests come back in ascending PCR order of the returned selection.
+    pcr_values = {}
+    digest_iter = iter(digests)
+    for selection in selection_out:
+        for pcr in range(selection.sizeofSelect * 8):
+            if selection.pcrSelect[pcr // 8] & (1 << (pcr % 8)):
+                pcr_values[str(pcr)] = '0x' + bytes(next(digest_iter)).hex().upper()
+    return pcr_values
+
+
+@ttl_cache(seconds=60)  # PCRs 0-9 are static post-boot; allow runtime extensions to surface
 def get_tpm_pcr_values():
     """Read TPM Platform Configuration Register values."""
     pcr_values = {}
-    
+
+    if ESAPI is not None:
+        try:
+            return _read_pcrs_pytss()
+        except Exception:
+            pass  # fall back to tpm2-tools below
+
     try:
-        # Try tpm2-tools first
-        result = subprocess.check_output(
-            ['tpm2_pcrread', 'sha256'],
-            stderr=subprocess.DEVNULL,
-            timeout=5
-        ).decode()
-        
-        for line in result.split('\n'):
-            if ':' in line and '0x' in line:
-                parts = line.strip().split(':')
-                if len(parts) >= 2:
-                    pcr_num = parts[0].strip()
-                    pcr_val = parts[1].strip()
-                    pcr_values[pcr_num] = pcr_val
-                    
+        # Shell out to tpm2-tools
+        with _TPM_LOCK:
+            result = subprocess.check_output(
+                ['tpm2_pcrread', _PCR_SELECTION],
+                stderr=subprocess.DEVNULL,
+                timeout=5
+            )
+
+        # Parse the raw bytes; only the matched index/digest pairs get decoded.
+        pcr_values.update(
+            (num.decode(), val.decode()) for num, val in _PCR_LINE_RE.findall(result)
+        )
+
     except FileNotFoundError:
         # tpm2-tools not installed
         pcr_values['error'] = 'tpm2-tools not installed'
@@ -128,6 +295,7 @@ def get_tpm_pcr_values():
     return pcr_values
 
 
+@ttl_cache(seconds=300)  # GPU CC mode does not flip at runtime
 def get_gpu_tee_status():
     """Check NVIDIA Confidential Computing status (for GPU TEE VMs)."""
     result = {
@@ -137,28 +305,27 @@ def get_gpu_tee_status():
     }
     
     try:
-        # Check if nvidia-smi is available
+        # Query only the two fields we report instead of parsing the
+        # full `nvidia-smi -q` dump (hundreds of KB of text).
         nvidia_smi = subprocess.check_output(
-            ['nvidia-smi', '-q'],
+            ['nvidia-smi', '--query-gpu=name,cc.mode.current', '--format=csv,noheader'],
             stderr=subprocess.DEVNULL,
             timeout=10
         ).decode()
-        
+
         result['gpu_detected'] = True
-        
-        # Check for Confidential Computing mode
-        if 'Confidential Computing' in nvidia_smi:
+
+        # First GPU only; e.g. "NVIDIA H100 NVL, ON"
+        name, _, cc_mode = nvidia_smi.split('\n', 1)[0].partition(',')
+        if name.strip():
+            result['gpu_model'] = name.strip()
+
+        if cc_mode.strip().upper() == 'ON':
             result['gpu_tee_verified'] = True
             result['nvidia_cc_mode'] = 'on'
         else:
             result['nvidia_cc_mode'] = 'off'
-        
-        # Get GPU model
-        for line in nvidia_smi.split('\n'):
-            if 'Product Name' in line:
-                result['gpu_model'] = line.split(':')[1].strip()
-                break
-                
+
     except FileNotFoundError:
         # No NVIDIA GPU or driver not installed
         pass
@@ -168,18 +335,71 @@ def get_gpu_tee_status():
     return result
 
 
+@ttl_cache(seconds=3600)  # VM size is fixed for the instance lifetime
 def get_vm_size():
     """Get Azure VM size from instance metadata."""
     try:
-        result = subprocess.check_output([
-            'curl', '-s', '-H', 'Metadata: true',
-            'http://169.254.169.254/metadata/instance/compute/vmSize?api-version=2021-02-01&format=text'
-        ], stderr=subprocess.DEVNULL, timeout=5).decode()
-        return result.strip()
+        result = _imds_get('/metadata/instance/compute/vmSize?api-version=2021-02-01&format=text')
+        return result.decode().strip()
     except Exception:
         return os.environ.get('VM_SIZE', 'Unknown')
 
 
+def build_attestation_response():
+    """Gather all attestation fields (the slow path).
+
+    The getters are independent, I/O-bound subprocess/HTTP calls; run them
+    concurrently so wall time is the slowest call, not the sum. The
+    timestamp is left as a placeholder for the handler to splice in.
+    """
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        dmesg_future = executor.submit(_read_dmesg)
+        vm_size_future = executor.submit(get_vm_size)
+        azure_future = executor.submit(get_azure_attestation)
+        pcr_future = executor.submit(get_tpm_pcr_values)
+        gpu_future = executor.submit(get_gpu_tee_status)
+
+        try:
+            dmesg = dmesg_future.result()
+        except Exception:
+            dmesg = None  # let the getters report the failure themselves
+        platform = get_tee_platform(dmesg)
+        response = {
+            'platform': platform,
+            'tee_verified': platform in ['Intel-TDX', 'AMD-SEV-SNP'],
+            'vm_size': vm_size_future.result(),
+            'azure_attestation': azure_future.result(),
+            'tpm_pcr_sha256': pcr_future.result(),
+            'tee_dmesg': get_tee_dmesg_lines(dmesg),
+            'timestamp': '__TS__'
+        }
+        gpu_status = gpu_future.result()
+
+    # Add GPU TEE info if applicable
+    if gpu_status['gpu_detected']:
+        response['gpu'] = gpu_status.get('gpu_model', 'NVIDIA-GPU')
+        response['gpu_tee_verified'] = gpu_status['gpu_tee_verified']
+        response['nvidia_cc_mode'] = gpu_status['nvidia_cc_mode']
+
+    return response
+
+
+def build_snapshot():
+    """Serialize the current attestation fields and publish the snapshot."""
+    global _SNAPSHOT
+    _SNAPSHOT = _dumps(build_attestation_response())
+
+
+def _refresh_loop():
+    """Rebuild the snapshot periodically so expiring fields stay fresh."""
+    while True:
+        time.sleep(_SNAPSHOT_REFRESH_SECONDS)
+        try:
+            build_snapshot()
+        except Exception as e:
+            print(f'Failed to refresh attestation snapshot: {e}')
+
+
 class AttestationHandler(BaseHTTPRequestHandler):
     """HTTP handler for attestation endpoints."""
     
@@ -189,67 +409,115 @@ class AttestationHandler(BaseHTTPRequestHandler):
         elif self.path == '/health':
             self.handle_health()
         else:
+            body = _dumps({'error': 'Not found'})
             self.send_response(404)
             self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
             self.end_headers()
-            self.wfile.write(json.dumps({'error': 'Not found'}).encode())
+            self.wfile.write(body)
     
     def handle_attestation(self):
-        """Return full attestation response."""
-        platform = get_tee_platform()
-        tee_dmesg = get_tee_dmesg_lines()
-        
-        response = {
-            'platform': platform,
-            'tee_verified': platform in ['Intel-TDX', 'AMD-SEV-SNP'],
-            'vm_size': get_vm_size(),
-            'azure_attestation': get_azure_attestation(),
-            'tpm_pcr_sha256': get_tpm_pcr_values(),
-            'tee_dmesg': tee_dmesg,
-            'timestamp': datetime.now(timezone.utc).isoformat()
-        }
-        
-        # Add GPU TEE info if applicable
-        gpu_status = get_gpu_tee_status()
-        if gpu_status['gpu_detected']:
-            response['gpu'] = gpu_status.get('gpu_model', 'NVIDIA-GPU')
-            response['gpu_tee_verified'] = gpu_status['gpu_tee_verified']
-            response['nvidia_cc_mode'] = gpu_status['nvidia_cc_mode']
-        
+        """Write the current attestation snapshot with a fresh timestamp."""
+        snapshot = _SNAPSHOT
+        if snapshot is None:
+            # First request raced ahead of startup priming.
+            build_snapshot()
+            snapshot = _SNAPSHOT
+
+        body = snapshot.replace(_TS_PLACEHOLDER, b'"' + _iso_now_bytes() + b'"')
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(response, indent=2).encode())
-    
+        self.wfile.write(body)
+
     def handle_health(self):
         """Return health check response."""
         response = {
             'status': 'healthy',
             'service': 'attestation',
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': _iso_now_bytes().decode()
         }
         
+        body = _dumps(response)
         self.send_response(200)
         self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(response).encode())
+        self.wfile.write(body)
     
+    # The fronting reverse proxy already logs requests; per-request stdout
+    # logging is opt-in via --access-log.
+    access_log = False
+
     def log_message(self, format, *args):
-        """Log requests to stdout."""
-        print(f"[{datetime.now().isoformat()}] {args[0]}")
+        """Log requests to stdout (only when --access-log is set)."""
+        if self.access_log:
+            line = '[%s] %s\n' % (time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), format % args)
+            sys.stdout.buffer.write(line.encode())
+            sys.stdout.buffer.flush()
+
+
+def _create_server(host, port, reuse_port=False):
+    """Create a ThreadingHTTPServer, optionally on a SO_REUSEPORT socket.
+
+    With SO_REUSEPORT each worker process binds its own listening socket
+    on the same port and the kernel load-balances incoming connections
+    across them.
+    """
+    # Threaded so a slow subprocess in one /attestation request doesn't
+    # block /health polls from other clients.
+    if not reuse_port:
+        return ThreadingHTTPServer((host, port), AttestationHandler)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    server = ThreadingHTTPServer((host, port), AttestationHandler, bind_and_activate=False)
+    server.socket.close()
+    server.socket = sock
+    # server_bind normally fills these in for the Server response header.
+    server.server_name = socket.getfqdn(host)
+    server.server_port = port
+    server.server_activate()
+    return server
 
 
 def main():
     parser = argparse.ArgumentParser(description='TrustedGenAi Attestation Server')
     parser.add_argument('--port', type=int, default=4001, help='Port to listen on (default: 4001)')
     parser.add_argument('--host', default='0.0.0.0', help='Host to bind to (default: 0.0.0.0)')
+    parser.add_argument('--access-log', action='store_true',
+                        help='Log each request to stdout (off by default; the reverse proxy logs)')
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help='Worker processes sharing the port via SO_REUSEPORT '
+                             '(default: CPU count - 1)')
     args = parser.parse_args()
-    
-    server = HTTPServer((args.host, args.port), AttestationHandler)
-    print(f'Attestation server running on http://{args.host}:{args.port}')
+
+    AttestationHandler.access_log = args.access_log
+
+    workers = max(1, args.workers)
+    if workers > 1 and not hasattr(socket, 'SO_REUSEPORT'):
+        print('SO_REUSEPORT not supported on this platform; running 1 worker')
+        workers = 1
+
+    print(f'Attestation server running on http://{args.host}:{args.port} ({workers} worker(s))')
     print(f'Endpoints: /attestation, /v1/attestation, /health')
-    
+
+    # Fork the extra workers before creating any sockets or threads; each
+    # process then primes its own snapshot and serves its own listener.
+    for _ in range(workers - 1):
+        if os.fork() == 0:
+            break
+
+    # Prime the snapshot before accepting traffic, then keep it fresh
+    # from a background thread; request handling is just a socket write.
+    build_snapshot()
+    threading.Thread(target=_refresh_loop, daemon=True).start()
+
+    server = _create_server(args.host, args.port, reuse_port=workers > 1)
+
     try:
         server.serve_forever()
     except KeyboardInterrupt: